@@ -23,40 +23,172 @@ Usage:
     Run this script in a Python environment with GUI support for matplotlib:
         python3 calc_demo.py
     At the prompt, select the desired demonstration.
+
+    For headless runs (CI, notebooks, servers) set MATHCODED_HEADLESS=1 to use the
+    non-interactive Agg backend; pass save_path to animate_equations to export an MP4.
     
 Dependencies:
     - matplotlib
+    - ffmpeg (only for MP4 export)
 """
 
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+import os
+
+# Set MATHCODED_HEADLESS=1 to render with the non-interactive Agg backend.
+HEADLESS = os.environ.get("MATHCODED_HEADLESS", "") not in ("", "0")
+
+# Figure shared by successive demos while its window stays open, plus the
+# callbacks that stop the previous demo's timer and event hooks before reuse.
+_FIG = None
+_FIG_TEARDOWN = []
+
+
+def _demo_figure(plt):
+    """
+    Return a cleared figure for the next demo, reusing the previous one if still open.
+
+    Reusing the figure skips backend canvas and window setup on each demo, which
+    matters when demos are run one after another from a REPL.
+    """
+    global _FIG
+    # A closed figure's number can be handed to a new figure, so also check that
+    # _FIG itself is still managed (a closed figure has no manager).
+    if (_FIG is not None and _FIG.canvas.manager is not None
+            and plt.fignum_exists(_FIG.number)):
+        for teardown in _FIG_TEARDOWN:
+            teardown()
+        _FIG.clear()
+    else:
+        _FIG = plt.figure(figsize=(8, 4))
+    _FIG_TEARDOWN.clear()
+    return _FIG
+
 
-def animate_equations(steps, title):
+def animate_equations(steps, title, save_path=None, fps=1/3, encoding_speed="medium"):
     """
     Animate a sequence of equations rendered in LaTeX.
 
     Parameters:
       steps (list of str): A list of LaTeX-formatted equation strings, each representing a step.
       title (str): Title for the demonstration.
+      save_path (str, optional): If given, encode the animation to this MP4 file with FFmpeg
+                                 instead of opening a window.
+      fps (float): Frame rate of the exported video (one step every 3 seconds by default).
+      encoding_speed (str): x264 preset used for the export, e.g. "ultrafast" or "medium".
+
+    Returns:
+      str or None: In headless mode without save_path, an HTML5 <video> snippet for
+                   display in a notebook; otherwise None.
     """
+    # Import matplotlib lazily so the menu in main() starts without paying for it.
+    import matplotlib
+    # Select the non-interactive Agg backend before pyplot is imported.
+    if HEADLESS:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation, FFMpegWriter
+
+    # Always use the built-in mathtext renderer: a matplotlibrc enabling usetex
+    # would otherwise shell out to LaTeX for every equation. Passed per artist so
+    # the user's global rcParams are left untouched.
+    text_kwargs = dict(usetex=False, math_fontfamily="dejavusans")
+
     # Create a new figure for the demonstration.
-    fig, ax = plt.subplots(figsize=(8, 4))
+    fig = _demo_figure(plt)
+    ax = fig.add_subplot()
     ax.axis("off")
-    ax.set_title(title, fontsize=16)
+    # No ticks at all: even hidden, their labels are laid out (with the global
+    # usetex setting) when the title is positioned.
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.set_title(title, fontsize=16, **text_kwargs)
     
-    # Text object for the equations; initially display the first step.
-    eq_text = ax.text(0.5, 0.5, steps[0], ha="center", va="center", fontsize=24, transform=ax.transAxes)
+    # One text object per step, laid out once up front; frames only toggle
+    # visibility so the mathtext parser never runs again while cycling.
+    artists = [
+        ax.text(0.5, 0.5, step, ha="center", va="center", fontsize=24,
+                transform=ax.transAxes, visible=False, **text_kwargs)
+        for step in steps
+    ]
+    # Lay out every step now so the mathtext parse and text metrics are cached
+    # before the first frame instead of on first display. Hidden text is never
+    # measured, so each artist is made visible just while it is laid out.
+    renderer = fig.canvas.get_renderer()
+    for artist in artists:
+        artist.set_visible(True)
+        artist.get_window_extent(renderer)
+        artist.set_visible(False)
     
-    # Animation update: update the equation based on the current frame.
-    def update(frame):
-        # Use modulo to cycle through steps.
-        index = frame % len(steps)
-        eq_text.set_text(steps[index])
-        return (eq_text,)
-
-    # Create a FuncAnimation to update every 3 seconds.
-    anim = FuncAnimation(fig, update, frames=range(0, len(steps)*5), interval=3000, blit=True, repeat=True)
+    # Show the given step and hide the previous one; returns the changed artists.
+    def show_step(index):
+        prev = (index - 1) % len(steps)
+        artists[prev].set_visible(False)
+        artists[index].set_visible(True)
+        return (artists[prev], artists[index])
+
+    if save_path is not None or HEADLESS:
+        # Exporting needs the animation machinery to step through frames.
+        def init():
+            for artist in artists:
+                artist.set_visible(False)
+            artists[0].set_visible(True)
+            return tuple(artists)
+
+        def update(frame):
+            # Use modulo to cycle through steps.
+            return show_step(frame % len(steps))
+
+        anim = FuncAnimation(fig, update, frames=range(0, len(steps)*5), init_func=init,
+                             interval=3000, blit=True, repeat=True)
+
+        if save_path is not None:
+            # Encode straight to MP4; much faster and smaller than GIF. Keep these
+            # settings in sync with video_export.write_mp4.
+            writer = FFMpegWriter(fps=fps, bitrate=1800, codec="libx264",
+                                  extra_args=["-preset", encoding_speed, "-pix_fmt", "yuv420p"])
+            anim.save(save_path, writer=writer)
+            plt.close(fig)
+            return None
+
+        # No GUI to show; hand back an embeddable video (e.g. for Jupyter).
+        html = anim.to_html5_video()
+        plt.close(fig)
+        return html
+
+    # Interactive: a plain timer swaps the visible step every 3 seconds and
+    # blits it over a cached background holding the title and blank axes.
+    for artist in artists:
+        artist.set_animated(True)
+    artists[0].set_visible(True)
+    background = [None]
+    current = [0]
+
+    def on_draw(event):
+        """Recapture the background after every full redraw (first show, resize)."""
+        background[0] = fig.canvas.copy_from_bbox(ax.bbox)
+        ax.draw_artist(artists[current[0]])
+
+    def tick():
+        """Advance to the next step."""
+        current[0] = (current[0] + 1) % len(steps)
+        show_step(current[0])
+        if background[0] is None:
+            fig.canvas.draw_idle()
+            return
+        fig.canvas.restore_region(background[0])
+        ax.draw_artist(artists[current[0]])
+        fig.canvas.blit(ax.bbox)
+
+    draw_cid = fig.canvas.mpl_connect("draw_event", on_draw)
+    timer = fig.canvas.new_timer(interval=3000)
+    timer.add_callback(tick)
+    timer.start()
+    _FIG_TEARDOWN.extend([timer.stop, lambda: fig.canvas.mpl_disconnect(draw_cid)])
+
+    # Draw once so the background bitmap is captured before the first tick.
+    fig.canvas.draw()
     plt.show()
+    return None
 
 
 def demo_completing_square():
@@ -90,11 +222,11 @@ def demo_integration_pattern():
          5. Substitute back to obtain ln|x^2+1| + C.
     """
     steps = [
-        r"$\displaystyle \int \frac{2x}{x^2+1}\,dx$",
-        r"Let $\displaystyle u=x^2+1$, so $\displaystyle du=2x\,dx$",
-        r"$\displaystyle =\int \frac{1}{u}\,du$",
-        r"$\displaystyle =\ln|u|+C$",
-        r"$\displaystyle =\ln|x^2+1|+C$"
+        r"$\int \dfrac{2x}{x^2+1}\,dx$",
+        r"Let $u=x^2+1$, so $du=2x\,dx$",
+        r"$=\int \dfrac{1}{u}\,du$",
+        r"$=\ln|u|+C$",
+        r"$=\ln|x^2+1|+C$"
     ]
     animate_equations(steps, "Integration by Substitution")
 
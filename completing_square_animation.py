@@ -15,16 +15,101 @@ Usage:
     Run this script in a Python environment with GUI support for matplotlib:
         python3 completing_square_animation.py
 
+    For headless runs (CI, notebooks, servers) set MATHCODED_HEADLESS=1 to use the
+    non-interactive Agg backend; pass save_path to animate_completing_square to export an MP4.
+
 Dependencies:
     - matplotlib
     - numpy
+    - ffmpeg (only for MP4 export)
 """
 
+import math
+import os
+
+import numpy as np
+import matplotlib
+
+# Select the non-interactive Agg backend before pyplot is imported.
+HEADLESS = os.environ.get("MATHCODED_HEADLESS", "") not in ("", "0")
+if HEADLESS:
+    matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
+from matplotlib.collections import PatchCollection
 from matplotlib.animation import FuncAnimation
 
-def animate_completing_square():
+from video_export import write_mp4
+
+# Frames per reveal phase; the animation has 2 * PHASE_FRAMES + 1 frames in total.
+PHASE_FRAMES = 20
+NUM_FRAMES = 2 * PHASE_FRAMES + 1
+
+
+def _reveal_progress(frame):
+    """
+    Return (phase, progress) for an animation frame.
+
+    Phase 1 (frames 0-20) reveals the missing square, phase 2 (frames 21-40) the
+    complete square outline; progress eases in and out from 0 to 1 within each
+    phase (cosine ease), so few frames still give smooth motion.
+    """
+    if frame <= PHASE_FRAMES:
+        phase, t = 1, frame / PHASE_FRAMES
+    else:
+        phase, t = 2, (frame - PHASE_FRAMES) / PHASE_FRAMES
+    return phase, 0.5 - 0.5 * math.cos(math.pi * t)
+
+
+def _render_rgb(fig):
+    """Render the figure with Agg and return a copy of its RGB pixels."""
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+def _save_composited(fig, missing_artists, outline_artists, frames, save_path, fps, encoding_speed):
+    """
+    Encode the animation to MP4, redrawing the figure only where it is needed.
+
+    Phase 1 frames are rendered by matplotlib: the missing square's label overlaps
+    its face and edge, and with both fading at alpha a those pixels are not a
+    linear blend of two keyframes. In phase 2 the outline and its label do not
+    overlap, so fading them in is a linear blend between the images without and
+    with them opaque; those frames are blended from two keyframes with numpy
+    (matching the on-screen fade to within rounding). Frames are piped to FFmpeg
+    as raw RGB by video_export.write_mp4.
+    """
+    def set_alpha(artists, alpha):
+        for artist in artists:
+            artist.set_alpha(alpha)
+
+    set_alpha(outline_artists, 0)
+    set_alpha(missing_artists, 1)
+    with_missing = _render_rgb(fig)
+    set_alpha(outline_artists, 1)
+    with_outline = _render_rgb(fig)
+    set_alpha(outline_artists, 0)
+
+    start = with_missing.astype(np.float32)
+    delta = with_outline.astype(np.float32) - start
+
+    def render_frames():
+        frame_buf = np.empty_like(start)
+        for frame in range(frames):
+            phase, progress = _reveal_progress(frame)
+            if phase == 1:
+                set_alpha(missing_artists, progress)
+                yield _render_rgb(fig)
+            else:
+                np.multiply(delta, progress, out=frame_buf)
+                frame_buf += start
+                yield np.rint(frame_buf).astype(np.uint8)
+
+    write_mp4(render_frames(), save_path, fps, encoding_speed)
+
+
+def animate_completing_square(save_path=None, fps=12, encoding_speed="medium"):
     """
     Animate the completing-the-square process.
 
@@ -34,9 +119,26 @@ def animate_completing_square():
       - A missing square (b/2)² that gradually appears.
       - The final complete square (x + b/2)² outlined with a dashed line.
     All labels are symbolic to emphasize the geometric rearrangement.
+
+    Parameters:
+      save_path (str, optional): If given, encode the animation to this MP4 file with FFmpeg
+                                 instead of opening a window.
+      fps (float): Frame rate of the exported video.
+      encoding_speed (str): x264 preset used for the export, e.g. "ultrafast" or "medium".
+
+    The MP4 export renders the first phase with matplotlib and blends the second
+    phase from two keyframes with numpy; the interactive window uses FuncAnimation.
+
+    Returns:
+      str or None: In headless mode without save_path, an HTML5 <video> snippet for
+                   display in a notebook; otherwise None.
     """
     # Setup figure and axis.
     fig, ax = plt.subplots(figsize=(6, 6))
+    if save_path is not None:
+        # Render the export offscreen with Agg, whatever the interactive backend is.
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        FigureCanvasAgg(fig)
     ax.set_xlim(-0.1, 1.6)
     ax.set_ylim(-0.1, 1.6)
     ax.set_aspect('equal')
@@ -52,14 +154,13 @@ def animate_completing_square():
     # ---------------------------
     # 1. x² (the original square)
     square_x2 = Rectangle((0, 0), x, x, facecolor='#ADD8E6', edgecolor='black', lw=2)
-    ax.add_patch(square_x2)
     ax.text(0.5 * x, 0.5 * x, "x²", ha='center', va='center', fontsize=14, color='black')
 
     # 2. The two rectangles representing x · (b/2)
     rect_R1 = Rectangle((x, 0), b_half, x, facecolor='#90EE90', edgecolor='black', lw=2)  # Right rectangle
     rect_R2 = Rectangle((0, x), x, b_half, facecolor='#90EE90', edgecolor='black', lw=2)  # Top rectangle
-    ax.add_patch(rect_R1)
-    ax.add_patch(rect_R2)
+    # The static pieces never change, so draw them as one collection.
+    ax.add_collection(PatchCollection([square_x2, rect_R1, rect_R2], match_original=True))
     ax.text(x + 0.5 * b_half, 0.5 * x, "x·(b/2)", ha='center', va='center', fontsize=12, color='black')
     ax.text(0.5 * x, x + 0.5 * b_half, "x·(b/2)", ha='center', va='center', fontsize=12, color='black')
 
@@ -74,30 +175,61 @@ def animate_completing_square():
     complete_text = ax.text(complete_side/2, complete_side/2, "(x + b/2)²", ha='center', va='center', fontsize=16, color='red', alpha=0)
 
     # ---------------------------
-    # Animation update function.
+    # Animation init and update functions.
     # ---------------------------
+    def init():
+        """
+        Hide the animated pieces so the blitting background is captured without them.
+        """
+        for artist in (missing_piece, missing_text, complete_square_outline, complete_text):
+            artist.set_alpha(0)
+        return missing_piece, missing_text, complete_square_outline, complete_text
+
     def update(frame):
         """
         Update the animation for the given frame.
 
-        Frames 0-50: Gradually reveal the missing square (b/2)².
-        Frames 51-100: Gradually reveal the complete square outline (x + b/2)².
+        Frames 0-20: Gradually reveal the missing square (b/2)².
+        Frames 21-40: Gradually reveal the complete square outline (x + b/2)².
+
+        Only the artists that need redrawing are returned, so blitting skips the rest.
         """
-        if frame <= 50:
+        phase, progress = _reveal_progress(frame)
+        if phase == 1:
             # Phase 1: Gradually reveal the missing piece.
-            new_alpha = frame / 50.0  # Interpolate alpha from 0 to 1.
-            missing_piece.set_alpha(new_alpha)
-            missing_text.set_alpha(new_alpha)
-        else:
-            # Phase 2: Gradually reveal the complete square's outline and label.
-            progress = (frame - 50) / 50.0  # Interpolate from 0 to 1.
-            complete_square_outline.set_alpha(progress)
-            complete_text.set_alpha(progress)
+            if frame == 0:
+                # Hide the outline again when the animation repeats; at alpha 0
+                # it does not need to be redrawn.
+                complete_square_outline.set_alpha(0)
+                complete_text.set_alpha(0)
+            missing_piece.set_alpha(progress)
+            missing_text.set_alpha(progress)
+            return missing_piece, missing_text
+        # Phase 2: Gradually reveal the complete square's outline and label.
+        # The missing piece is animated (not part of the cached background), so
+        # it is still returned to be redrawn, but its alpha is left untouched.
+        complete_square_outline.set_alpha(progress)
+        complete_text.set_alpha(progress)
         return missing_piece, missing_text, complete_square_outline, complete_text
 
+    if save_path is not None:
+        # Encode straight to MP4, blending frames from keyframes where possible.
+        _save_composited(fig, (missing_piece, missing_text), (complete_square_outline, complete_text),
+                         NUM_FRAMES, save_path, fps, encoding_speed)
+        plt.close(fig)
+        return None
+
     # Create and run the animation.
-    anim = FuncAnimation(fig, update, frames=101, interval=50, blit=True, repeat=True)
+    anim = FuncAnimation(fig, update, frames=NUM_FRAMES, init_func=init, interval=83, blit=True, repeat=True)
+
+    if HEADLESS:
+        # No GUI to show; hand back an embeddable video (e.g. for Jupyter).
+        html = anim.to_html5_video()
+        plt.close(fig)
+        return html
+
     plt.show()
+    return None
 
 if __name__ == '__main__':
     animate_completing_square()
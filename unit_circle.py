@@ -1,8 +1,12 @@
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.widgets import Slider
+# Points of the fixed unit circle, computed on first use and shared across calls.
+# Matplotlib only simplifies paths with at least 128 vertices, so fewer samples
+# would silently disable the path simplification applied to the circle below.
+_UNIT_SAMPLES = 128
+_UNIT_X = None
+_UNIT_Y = None
 
-def interactive_unit_circle():
+
+def interactive_unit_circle(record_path=None, fps=30, sweep_seconds=12, encoding_speed="medium"):
     """
     Create an interactive unit circle visualization.
     
@@ -12,16 +16,50 @@ def interactive_unit_circle():
     • As you change the angle, a radius from the origin to the circle is updated.
     • The horizontal and vertical projection lines display the cosine and sine values.
     • Educational annotations display the computed cosine and sine.
+
+    Parameters:
+      record_path (str, optional): If given, render a 0-360° sweep offscreen with Agg
+                                   and encode it to this MP4 file instead of opening
+                                   a window (requires ffmpeg).
+      fps (int): Frame rate of the recording.
+      sweep_seconds (float): Duration of the recorded sweep.
+      encoding_speed (str): x264 preset used for the recording, e.g. "ultrafast" or "medium".
     """
+    global _UNIT_X, _UNIT_Y
+
+    # Import numpy and matplotlib lazily, only once the visualization is requested.
+    import numpy as np
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.widgets import Slider
+
+    # Lookup table of (cos, sin) at 0.1° resolution over 0-360°, so slider
+    # callbacks index into it instead of evaluating trig functions.
+    lut_angles = np.deg2rad(np.arange(3601) / 10.0)
+    trig_lut = np.stack([np.cos(lut_angles), np.sin(lut_angles)], axis=1)
+
     # Create the figure and axis for the plot.
-    fig, ax = plt.subplots(figsize=(8, 8))
+    # No layout engine: the manual subplots_adjust below is final, so a
+    # matplotlibrc enabling tight/constrained layout cannot re-run it on every draw.
+    fig, ax = plt.subplots(figsize=(8, 8), layout="none")
+    if record_path is not None:
+        # Render offscreen, whatever the interactive backend is.
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        FigureCanvasAgg(fig)
     plt.subplots_adjust(left=0.1, bottom=0.25)  # leave space at the bottom for the slider
     
     # Plot the fixed unit circle.
-    theta_full = np.linspace(0, 2 * np.pi, 400)
-    x_full = np.cos(theta_full)
-    y_full = np.sin(theta_full)
-    ax.plot(x_full, y_full, label="Unit Circle", color="navy")
+    if _UNIT_X is None:
+        theta_full = np.linspace(0, 2 * np.pi, _UNIT_SAMPLES)
+        _UNIT_X = np.cos(theta_full)
+        _UNIT_Y = np.sin(theta_full)
+    # Faster path rendering: let Agg merge vertices of the circle that deviate by
+    # less than one pixel. The settings are read when the line's Path is built
+    # (inside ax.plot), so they are scoped to this artist rather than set globally;
+    # they only take effect because the path has _UNIT_SAMPLES >= 128 vertices.
+    # The circle may look very slightly polygonal up close.
+    with matplotlib.rc_context({"path.simplify": True, "path.simplify_threshold": 1.0}):
+        ax.plot(_UNIT_X, _UNIT_Y, label="Unit Circle", color="navy")
     
     # Draw x and y axes.
     ax.axhline(0, color="black", linewidth=0.5)
@@ -43,67 +81,165 @@ def interactive_unit_circle():
     x_val = np.cos(initial_angle_rad)
     y_val = np.sin(initial_angle_rad)
     
+    # 2-point (x, y) buffers for the dynamic lines, reused and mutated in place on each update.
+    radius_xy = np.array([[0.0, x_val], [0.0, y_val]])
+    cosine_xy = np.array([[x_val, x_val], [0.0, y_val]])
+    sine_xy = np.array([[0.0, x_val], [y_val, y_val]])
+
     # Plot the dynamic radius line for the current angle.
-    radius_line, = ax.plot([0, x_val], [0, y_val], linestyle="--", linewidth=2,
+    radius_line, = ax.plot(*radius_xy, linestyle="--", linewidth=2,
                             color="orange", label="Radius")
     
     # Plot the projection lines: vertical (sine) and horizontal (cosine).
-    cosine_line, = ax.plot([x_val, x_val], [0, y_val], linestyle=":", color="green")
-    sine_line, = ax.plot([0, x_val], [y_val, y_val], linestyle=":", color="green")
+    cosine_line, = ax.plot(*cosine_xy, linestyle=":", color="green")
+    sine_line, = ax.plot(*sine_xy, linestyle=":", color="green")
     
+    # Format templates for the annotations, built once and filled in on each update.
+    cos_tmpl = "cos(%.1f°) = %.2f"
+    sin_tmpl = "sin(%.1f°) = %.2f"
+    info_tmpl = ("Unit Circle Basics:\n"
+                 "x = cos(θ)   y = sin(θ)\n"
+                 "For θ = %.1f°:\n"
+                 "cos ≈ %.2f, sin ≈ %.2f")
+
     # Add text annotations for cosine and sine values.
-    cosine_text = ax.text(x_val/2, -0.1, f"cos({initial_angle_deg}°) = {x_val:.2f}",
+    cosine_text = ax.text(x_val/2, -0.1, cos_tmpl % (initial_angle_deg, x_val),
                           ha="center", fontsize=10, color="purple")
-    sine_text = ax.text(-0.5, y_val/2, f"sin({initial_angle_deg}°) = {y_val:.2f}",
+    sine_text = ax.text(-0.5, y_val/2, sin_tmpl % (initial_angle_deg, y_val),
                         ha="center", fontsize=10, color="purple")
     
     # Display an informational annotation box on the side.
-    info_text = ax.text(1.1, 0.5,
-                        "Unit Circle Basics:\n"
-                        "x = cos(θ)   y = sin(θ)\n"
-                        f"For θ = {initial_angle_deg}°:\n"
-                        f"cos ≈ {x_val:.2f}, sin ≈ {y_val:.2f}",
+    info_text = ax.text(1.1, 0.5, info_tmpl % (initial_angle_deg, x_val, y_val),
                         fontsize=10, bbox=dict(facecolor="lightyellow", alpha=0.5))
     
-    # Add legend.
-    ax.legend()
+    # Add legend; it is static, so it stays part of the cached blitting background.
+    legend = ax.legend()
+    legend.set_animated(False)
 
     # Create an axis for the slider.
     slider_axis = plt.axes([0.1, 0.1, 0.8, 0.05])
     angle_slider = Slider(slider_axis, "Angle (°)", 0, 360, valinit=initial_angle_deg)
 
-    def update(val):
-        """Update the plot elements based on the slider value."""
-        angle_deg = angle_slider.val
-        angle_rad = np.radians(angle_deg)
-        x_val = np.cos(angle_rad)
-        y_val = np.sin(angle_rad)
+    # Last positions given to the cosine/sine labels (x of cosine, y of sine).
+    label_pos = [x_val/2, y_val/2]
+
+    def update(angle_deg):
+        """Update the plot elements for the given angle in degrees."""
+        x_val, y_val = trig_lut[int(round(angle_deg * 10)) % 3601]
         
         # Update the radius line.
-        radius_line.set_data([0, x_val], [0, y_val])
+        radius_xy[0, 1] = x_val
+        radius_xy[1, 1] = y_val
+        radius_line.set_data(radius_xy[0], radius_xy[1])
         # Update the projection lines.
-        cosine_line.set_data([x_val, x_val], [0, y_val])
-        sine_line.set_data([0, x_val], [y_val, y_val])
+        cosine_xy[0] = x_val
+        cosine_xy[1, 1] = y_val
+        cosine_line.set_data(cosine_xy[0], cosine_xy[1])
+        sine_xy[0, 1] = x_val
+        sine_xy[1] = y_val
+        sine_line.set_data(sine_xy[0], sine_xy[1])
         
         # Update the text annotations.
-        cosine_text.set_text(f"cos({angle_deg:.1f}°) = {x_val:.2f}")
-        cosine_text.set_position((x_val/2, -0.1))
-        sine_text.set_text(f"sin({angle_deg:.1f}°) = {y_val:.2f}")
-        sine_text.set_position((-0.5, y_val/2))
+        cosine_text.set_text(cos_tmpl % (angle_deg, x_val))
+        sine_text.set_text(sin_tmpl % (angle_deg, y_val))
+        # Only move the labels when they would shift by at least one pixel.
+        px_per_unit = ax.bbox.width / (ax.get_xlim()[1] - ax.get_xlim()[0])
+        if abs(x_val/2 - label_pos[0]) * px_per_unit >= 1:
+            label_pos[0] = x_val/2
+            cosine_text.set_position((label_pos[0], -0.1))
+        if abs(y_val/2 - label_pos[1]) * px_per_unit >= 1:
+            label_pos[1] = y_val/2
+            sine_text.set_position((-0.5, label_pos[1]))
         
         # Update the info box.
-        info_text.set_text(
-            "Unit Circle Basics:\n"
-            "x = cos(θ)   y = sin(θ)\n"
-            f"For θ = {angle_deg:.1f}°:\n"
-            f"cos ≈ {x_val:.2f}, sin ≈ {y_val:.2f}"
-        )
+        info_text.set_text(info_tmpl % (angle_deg, x_val, y_val))
         
-        fig.canvas.draw_idle()
+        # Repaint only the dynamic artists over the cached static background.
+        if background[0] is None:
+            fig.canvas.draw_idle()
+            return
+        fig.canvas.restore_region(background[0])
+        draw_dynamic()
+        fig.canvas.blit(fig.bbox)
+
+    # Blitting: the unit circle, axes and legend are rendered once
+    # into a cached background; only the dynamic artists are redrawn per update.
+    dynamic_artists = (radius_line, cosine_line, sine_line, cosine_text, sine_text, info_text)
+    for artist in dynamic_artists:
+        artist.set_animated(True)
+    slider_axis.set_animated(True)  # the handle and value label move with the angle
+    angle_slider.drawon = False  # the slider would otherwise trigger a full redraw
+    background = [None]
+
+    def draw_dynamic():
+        """Draw the animated artists (and the slider) on top of the background."""
+        for artist in dynamic_artists:
+            ax.draw_artist(artist)
+        fig.draw_artist(slider_axis)
+
+    def on_draw(event):
+        """Recapture the background after every full redraw (first show, resize)."""
+        background[0] = fig.canvas.copy_from_bbox(fig.bbox)
+        draw_dynamic()
+
+    fig.canvas.mpl_connect("draw_event", on_draw)
+
+    # Throttle: slider events only record the latest angle; a ~60 Hz timer
+    # performs at most one redraw per tick, however fast the mouse moves.
+    pending = [False]
+    latest = [initial_angle_deg]
+
+    def on_slider_change(val):
+        """Record the new slider value and mark a redraw as pending."""
+        latest[0] = val
+        pending[0] = True
+
+    def on_timer():
+        """Redraw once if the slider moved since the last tick."""
+        if pending[0]:
+            pending[0] = False
+            update(latest[0])
+
+    timer = fig.canvas.new_timer(interval=16)
+    timer.add_callback(on_timer)
+    timer.start()
+
+    angle_slider.on_changed(on_slider_change)
+
+    if record_path is not None:
+        # Drive the slider through a full sweep; each frame goes through the same
+        # blitting update as dragging, and the Agg buffer is piped to FFmpeg.
+        from video_export import write_mp4
+
+        def sweep_frames():
+            for angle_deg in np.linspace(0, 360, int(sweep_seconds * fps)):
+                angle_slider.set_val(angle_deg)
+                on_timer()
+                yield np.asarray(fig.canvas.buffer_rgba())
+
+        fig.canvas.draw()
+        try:
+            write_mp4(sweep_frames(), record_path, fps, encoding_speed)
+        finally:
+            plt.close(fig)
+        return
 
-    angle_slider.on_changed(update)
     plt.show()
 
 
+def record(path, fps=30, sweep_seconds=12, encoding_speed="medium"):
+    """
+    Record a 0-360° sweep of the unit circle to an MP4 file, e.g. for teaching material.
+
+    Parameters:
+      path (str): Output MP4 file.
+      fps (int): Frame rate of the recording.
+      sweep_seconds (float): Duration of the sweep.
+      encoding_speed (str): x264 preset, e.g. "ultrafast" or "medium".
+    """
+    interactive_unit_circle(record_path=path, fps=fps, sweep_seconds=sweep_seconds,
+                            encoding_speed=encoding_speed)
+
+
 if __name__ == "__main__":
     interactive_unit_circle()
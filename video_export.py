@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+File: video_export.py
+Author: Kevin Mastascusa
+Date: Thu Oct 15, 2026
+Description:
+    Shared MP4 export helper for the demos. Frames rendered offscreen (numpy RGB
+    arrays) are piped as raw video straight into FFmpeg and encoded with libx264,
+    which is much faster and smaller than writing a GIF.
+
+    calc_demo.animate_equations still exports through matplotlib's FFMpegWriter,
+    with the same libx264 / 1800k / preset / yuv420p settings; keep the two in sync.
+
+Dependencies:
+    - matplotlib (for the configured ffmpeg path)
+    - numpy
+    - ffmpeg
+"""
+
+import subprocess
+
+import numpy as np
+import matplotlib
+
+
+def write_mp4(frames, save_path, fps, encoding_speed="medium"):
+    """
+    Encode a sequence of RGB frames to an MP4 file with FFmpeg.
+
+    Parameters:
+      frames (iterable of ndarray): Equally sized uint8 arrays of shape (height, width, 3)
+                                    or (height, width, 4); any alpha channel is dropped
+                                    and odd dimensions are cropped by one pixel, since
+                                    yuv420p needs even dimensions.
+      save_path (str): Output MP4 file.
+      fps (float): Frame rate of the video.
+      encoding_speed (str): x264 preset, e.g. "ultrafast" or "medium".
+
+    Raises:
+      ValueError: If frames is empty (ffmpeg is then never started).
+      RuntimeError: If ffmpeg exits with a non-zero status (including when it exits early).
+    """
+    proc = None
+    try:
+        for frame in frames:
+            if proc is None:
+                height, width = frame.shape[0] & ~1, frame.shape[1] & ~1
+                cmd = [matplotlib.rcParams["animation.ffmpeg_path"], "-y", "-loglevel", "error",
+                       "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+                       "-r", str(fps), "-i", "-", "-c:v", "libx264", "-preset", encoding_speed,
+                       "-b:v", "1800k", "-pix_fmt", "yuv420p", save_path]
+                proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            proc.stdin.write(np.ascontiguousarray(frame[:height, :width, :3]).tobytes())
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its exit status is reported below.
+    finally:
+        if proc is not None:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            proc.wait()
+    if proc is None:
+        raise ValueError(f"no frames to write to {save_path}")
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited with status {proc.returncode} while writing {save_path}")